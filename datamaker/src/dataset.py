@@ -1,11 +1,24 @@
-import shutil
-from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
+from concurrent.futures import ThreadPoolExecutor
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED
+import mmap
 import os
+import shutil
+
+try:
+    # ISA-L's vectorised DEFLATE/CRC is a drop-in zlib replacement and
+    # several times faster; fall back to stdlib zlib when not installed
+    from isal import isal_zlib as zlib
+    COMPRESS_LEVEL = zlib.ISAL_DEFAULT_COMPRESSION
+except ImportError:
+    import zlib
+    COMPRESS_LEVEL = 6
+
 from datetime import datetime
 import mimetypes
-import pandas as pd
 import io
-from cairosvg import svg2png
+
+# openpyxl and cairosvg are imported lazily at their use sites -- both are
+# slow to import and only needed when an archive is actually written
 
 #===============================================================================
 
@@ -20,6 +33,151 @@ from datamaker.src.tools import get_mapmaker_version, get_mapknowledge_version,
 
 #===============================================================================
 
+# Size of the blocks read and written when piping files into the archive.
+# A large buffer keeps the number of read()/write() round-trips per MB low.
+COPY_BUFSIZE = 1 << 20
+
+# shutil's default buffer also feeds copy paths inside the stdlib (e.g.
+# fallback copies); make sure those move large blocks too
+if getattr(shutil, 'COPY_BUFSIZE', 0) < COPY_BUFSIZE:
+    shutil.COPY_BUFSIZE = COPY_BUFSIZE
+
+# Files above this size are mapped into memory rather than read in blocks,
+# letting the kernel handle readahead with one syscall per file
+MMAP_THRESHOLD = 4 << 20
+
+# File formats that are already compressed, for which DEFLATE burns CPU
+# for almost no size gain -- these are stored in the archive as is
+STORED_SUFFIXES = frozenset([
+    '.png', '.jpg', '.jpeg', '.gz', '.zip', '.xz', '.zst',
+    '.mbtiles', '.xlsx', '.pptx',
+])
+
+# Linux's copy_file_range moves bytes between file descriptors inside the
+# kernel; used for STORED entries where no recompression is needed
+HAVE_COPY_FILE_RANGE = hasattr(os, 'copy_file_range')
+
+def copy_into_archive(src, dest, buffer):
+    # readinto() fills a preallocated buffer, avoiding a fresh bytes object
+    # per read; the buffer is reused across all the files of an archive
+    view = memoryview(buffer)
+    while (count := src.readinto(buffer)):
+        dest.write(view[:count])
+
+def compress_file(path, compress=True):
+    # Raw DEFLATE a file's contents, returning the compressed bytes along
+    # with the CRC and uncompressed size needed for the zip entry's header.
+    # Run in worker threads; zlib releases the GIL while compressing.
+    # With compress=False the raw bytes are returned for a STORED entry.
+    size = os.path.getsize(path)
+    if size > MMAP_THRESHOLD:
+        try:
+            with open(path, 'rb') as src, mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                # one C-level pass computes the whole file's CRC, instead
+                # of updating it chunk by chunk
+                crc = zlib.crc32(mapped)
+                if not compress:
+                    return bytes(mapped), crc, size
+                compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -15)
+                blocks = []
+                view = memoryview(mapped)
+                try:
+                    for start in range(0, size, COPY_BUFSIZE):
+                        blocks.append(compressor.compress(view[start:start + COPY_BUFSIZE]))
+                finally:
+                    view.release()
+                blocks.append(compressor.flush())
+                return b''.join(blocks), crc, size
+        except (OSError, ValueError):
+            pass    # fall back to the block-read loop
+    buffer = bytearray(COPY_BUFSIZE)
+    view = memoryview(buffer)
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -15) if compress else None
+    blocks = []
+    crc = 0
+    size = 0
+    with open(path, 'rb', buffering=0) as src:
+        while (count := src.readinto(buffer)):
+            chunk = view[:count]
+            crc = zlib.crc32(chunk, crc)
+            size += count
+            blocks.append(compressor.compress(chunk) if compress else bytes(chunk))
+    if compress:
+        blocks.append(compressor.flush())
+    return b''.join(blocks), crc, size
+
+def crc_file(path):
+    # CRC and size of a file without retaining its contents
+    size = os.path.getsize(path)
+    if size > MMAP_THRESHOLD:
+        try:
+            with open(path, 'rb') as src, mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return zlib.crc32(mapped), size
+        except (OSError, ValueError):
+            pass
+    buffer = bytearray(COPY_BUFSIZE)
+    view = memoryview(buffer)
+    crc = 0
+    size = 0
+    with open(path, 'rb', buffering=0) as src:
+        while (count := src.readinto(buffer)):
+            crc = zlib.crc32(view[:count], crc)
+            size += count
+    return crc, size
+
+def write_stored_file(archive, zinfo, path, crc, size):
+    # Append a STORED entry by copying the file's bytes kernel-side with
+    # os.copy_file_range -- they never pass through user space
+    zinfo.CRC = crc
+    zinfo.compress_size = size
+    zinfo.file_size = size
+    with archive._lock:
+        archive._didModify = True
+        zinfo.header_offset = archive.fp.tell()
+        # let FileHeader decide zip64 from the entry's sizes -- tilesets
+        # can exceed the 2GiB limit and the archive allows zip64
+        archive.fp.write(zinfo.FileHeader(None))
+        archive.fp.flush()
+        out_fd = archive.fp.fileno()
+        remaining = size
+        with open(path, 'rb', buffering=0) as src:
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), out_fd, remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            except OSError:
+                pass    # e.g. filesystem without support -- copy the rest below
+            if remaining > 0:
+                src.seek(size - remaining)
+                while (chunk := src.read(1 << 20)):
+                    written = 0
+                    while written < len(chunk):
+                        written += os.write(out_fd, chunk[written:])
+        # resynchronise the buffered writer with the moved file offset
+        archive.fp.seek(0, os.SEEK_END)
+        archive.start_dir = archive.fp.tell()
+        archive.filelist.append(zinfo)
+        archive.NameToInfo[zinfo.filename] = zinfo
+
+def write_precompressed(archive, zinfo, data, crc, size):
+    # Append an already-compressed entry to the archive, bypassing the
+    # recompression that archive.open(zinfo, 'w') would do
+    zinfo.CRC = crc
+    zinfo.compress_size = len(data)
+    zinfo.file_size = size
+    with archive._lock:
+        archive._didModify = True
+        zinfo.header_offset = archive.fp.tell()
+        archive.fp.write(zinfo.FileHeader(None))
+        archive.fp.write(data)
+        archive.start_dir = archive.fp.tell()
+        archive.filelist.append(zinfo)
+        archive.NameToInfo[zinfo.filename] = zinfo
+
+#===============================================================================
+
 # for implementation this line probably is not necessary
 # when combined with flatmap_maker, maninfest object should use the available
 #    object, to manage uuid consistency
@@ -55,69 +213,129 @@ class Dataset:
         self.__log_file = log_file
 
     def save_archive(self):
-        dataset_archive = ZipFile(self.__dataset_output, mode='w', compression=ZIP_DEFLATED)
+        # a large write buffer batches DEFLATE's small output bursts into
+        # one syscall per megabyte instead of one per burst; the context
+        # managers guarantee both are flushed and closed on any exit path
+        with io.BufferedWriter(open(self.__dataset_output, 'wb', buffering=0),
+                               buffer_size=COPY_BUFSIZE) as output, \
+             ZipFile(output, mode='w', compression=ZIP_DEFLATED,
+                     compresslevel=6, allowZip64=True) as dataset_archive:
 
-        # copy primary data
-        self.__copy_primary(dataset_archive)
-        
-        # this one save derivatives
-        self.__copy_derivative(dataset_archive)
-        
-        # adding dataset_description
-        dataset_description = self.__source.dataset_description
-        dataset_archive.write(str(dataset_description), arcname=f'files/{dataset_description.name}')
+            # copy primary data
+            self.__copy_primary(dataset_archive)
+
+            # this one save derivatives
+            self.__copy_derivative(dataset_archive)
 
-        # create and save banner file
-        self.__create_banner(dataset_archive)
+            # adding dataset_description
+            dataset_description = self.__source.dataset_description
+            dataset_archive.write(str(dataset_description), arcname=f'files/{dataset_description.name}')
 
-        # create and save proper readme file, generated for dataset_description
-        # dont forget to add SCKAN and MapMaker versions
-        # self.__add_readme(dataset_a rchive)
+            # create and save banner file
+            self.__create_banner(dataset_archive)
 
-        # close archive
-        dataset_archive.close()
+            # create and save proper readme file, generated for dataset_description
+            # dont forget to add SCKAN and MapMaker versions
+            # self.__add_readme(dataset_a rchive)
 
     def __copy_primary(self, archive):
         for dataset_manifest in self.__source.dataset_manifests:
+            zinfos = []
             for file in dataset_manifest.files:
-                zinfo = ZipInfo.from_file(str(file.fullpath), arcname=f'files/primary/{file.filename}')
-                zinfo.compress_type = ZIP_DEFLATED
+                # the manifest already carries each file's timestamp so
+                # there's no need for the stat() behind ZipInfo.from_file
                 timestamp = file.timestamp
-                zinfo.date_time = (timestamp.year, timestamp.month, timestamp.day,
-                                timestamp.hour, timestamp.minute, timestamp.second)
-                with open(file.fullpath, "rb") as src, archive.open(zinfo, 'w') as dest:
-                    shutil.copyfileobj(src, dest, 1024*8)
+                zinfo = ZipInfo(filename=f'files/primary/{file.filename}',
+                                date_time=(timestamp.year, timestamp.month, timestamp.day,
+                                           timestamp.hour, timestamp.minute, timestamp.second))
+                zinfo.compress_type = (ZIP_STORED if file.fullpath.suffix.lower() in STORED_SUFFIXES
+                                       else ZIP_DEFLATED)
+                zinfo.external_attr = 0o644 << 16
+                zinfos.append(zinfo)
+            # Compress files in parallel but append them to the archive in
+            # manifest order as each result becomes available; STORED
+            # entries are kernel-copied into place where supported
+            with ThreadPoolExecutor() as executor:
+                tasks = []
+                for file, zinfo in zip(dataset_manifest.files, zinfos):
+                    if zinfo.compress_type == ZIP_DEFLATED:
+                        tasks.append(executor.submit(compress_file, file.fullpath))
+                    elif HAVE_COPY_FILE_RANGE:
+                        tasks.append(executor.submit(crc_file, file.fullpath))
+                    else:
+                        tasks.append(executor.submit(compress_file, file.fullpath, False))
+                for file, zinfo, task in zip(dataset_manifest.files, zinfos, tasks):
+                    if zinfo.compress_type == ZIP_STORED and HAVE_COPY_FILE_RANGE:
+                        crc, size = task.result()
+                        write_stored_file(archive, zinfo, file.fullpath, crc, size)
+                    else:
+                        data, crc, size = task.result()
+                        write_precompressed(archive, zinfo, data, crc, size)
             manifest = dataset_manifest.manifest
             archive.write(str(manifest), arcname=f'files/primary/{manifest.name}')
         
     def __copy_derivative(self, archive):
         if self.__derivative_path != None:
             derivative_files = []
+            entries = []
             for root, dirs, files in os.walk(self.__derivative_path):
                 for filename in files:
                     if filename.startswith('.'):
                         continue
                     # Get the full path of the file
                     fullpath = os.path.join(root, filename)
-                    zinfo = ZipInfo.from_file(fullpath, arcname=f'files/derivative/{filename}')
+                    # one stat() supplies both the timestamp and the size
+                    # used when copying the entry below
+                    stat_result = os.stat(fullpath)
+                    timestamp = datetime.fromtimestamp(stat_result.st_mtime)
+                    zinfo = ZipInfo(filename=f'files/derivative/{filename}',
+                                    date_time=(timestamp.year, timestamp.month, timestamp.day,
+                                               timestamp.hour, timestamp.minute, timestamp.second))
                     zinfo.compress_type = ZIP_DEFLATED
-                    timestamp = datetime.fromtimestamp(os.path.getmtime(fullpath))
-                    zinfo.date_time = (timestamp.year, timestamp.month, timestamp.day,
-                                    timestamp.hour, timestamp.minute, timestamp.second)
-                    with open(fullpath, "rb") as src, archive.open(zinfo, 'w') as dest:
-                        shutil.copyfileobj(src, dest, 1024*8)
+                    zinfo.external_attr = 0o644 << 16
+                    entries.append((fullpath, zinfo, stat_result.st_size))
                     file_type = mimetypes.guess_type(fullpath, strict=False)[0]
                     if file_type is None:
                         file_type = fullpath.split('.')[-1]
                     derivative_files += [[filename, timestamp.isoformat(), 'derivative file loaded by map server', file_type]]
+            if len(entries) > 4:
+                # enough files for parallel compression to outweigh the
+                # pool setup; entries still land in walk order
+                with ThreadPoolExecutor() as executor:
+                    compressed = executor.map(compress_file,
+                                              (fullpath for fullpath, zinfo, size in entries))
+                    for (fullpath, zinfo, _), (data, crc, size) in zip(entries, compressed):
+                        write_precompressed(archive, zinfo, data, crc, size)
+            else:
+                buffer = bytearray(COPY_BUFSIZE)
+                for fullpath, zinfo, size in entries:
+                    if size <= COPY_BUFSIZE:
+                        # One-shot write avoids per-entry stream setup for
+                        # the many small files a generated flatmap contains
+                        with open(fullpath, 'rb') as src:
+                            archive.writestr(zinfo, src.read())
+                    else:
+                        with open(fullpath, 'rb', buffering=0) as src, archive.open(zinfo, 'w') as dest:
+                            if size > MMAP_THRESHOLD:
+                                try:
+                                    with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                                        dest.write(mapped)
+                                except (OSError, ValueError):
+                                    copy_into_archive(src, dest, buffer)
+                            else:
+                                copy_into_archive(src, dest, buffer)
             if len(derivative_files) > 0:
+                import openpyxl
                 columns = ['filename', 'timestamp', 'description', 'file type',]
                 excel_file = io.BytesIO()
-                df = pd.DataFrame(derivative_files, columns=columns)
-                writer = pd.ExcelWriter(excel_file, engine='xlsxwriter')
-                df.to_excel(writer, sheet_name='Sheet1', index=False)
-                writer.close()
-                excel_file.seek(0)
+                # write-only mode streams rows without materialising a
+                # DataFrame and a full workbook cell tree first
+                workbook = openpyxl.Workbook(write_only=True)
+                worksheet = workbook.create_sheet('Sheet1')
+                worksheet.append(columns)
+                for record in derivative_files:
+                    worksheet.append(record)
+                workbook.save(excel_file)
                 archive.writestr('files/derivative/manifest.xlsx', excel_file.getvalue())
 
     def __add_readme(self, archive):
@@ -149,6 +367,7 @@ class Dataset:
             image_path = os.path.join(options.output_dir, list(extractor.saved_svg.values())[0])
         
         if image_path.endswith('.svg'):
+            from cairosvg import svg2png
             png_data = svg2png(url=image_path)
             archive.writestr('files/banner.png', png_data)
         else:
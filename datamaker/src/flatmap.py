@@ -19,18 +19,27 @@
 #===============================================================================
 
 from collections import defaultdict
+import copy
 from dataclasses import dataclass
 from datetime import datetime
-import json
+import functools
+import hashlib
+import importlib.resources
+import os
 from pathlib import Path
 import mimetypes
+import sys
+import tempfile
 
-import pandas
-
-import openpyxl
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from io import BytesIO
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 #===============================================================================
 
 class SourceError(Exception):
@@ -42,6 +51,70 @@ MAPPING_URL = "https://github.com/napakalas/flatmap-datamaker/blob/main/datamake
 
 #===============================================================================
 
+# One session for all template/mapping fetches: keep-alive avoids a fresh
+# TCP+TLS handshake per request and transient failures are retried
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                       max_retries=Retry(total=3, backoff_factor=0.5)))
+
+@functools.lru_cache(maxsize=8)
+def fetch_content(url, content_type):
+    """
+    Fetch a URL's content, caching it so that the version mapping and the
+    dataset_description template are only downloaded once per process.
+    """
+    response = _SESSION.get(url, headers={'Content-Type': content_type}, timeout=30)
+    response.raise_for_status()
+    return response.content
+
+def cached_mapping():
+    """
+    The version mapping's bytes, fetched once per process and mirrored to
+    disk so that an offline run can fall back to the last downloaded copy.
+    """
+    cache_file = Path(tempfile.gettempdir()) / 'datamaker' / 'data_mapping.json'
+    try:
+        content = fetch_content(MAPPING_URL, 'application/json')
+    except requests.RequestException:
+        if cache_file.exists():
+            return cache_file.read_bytes()
+        raise
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_bytes(content)
+    except OSError:
+        pass    # caching is best effort
+    return content
+
+@functools.lru_cache(maxsize=4)
+def cached_template(template_link):
+    """
+    Template bytes for a dataset_description, kept in memory for the life
+    of the process and in a small on-disk cache so repeated runs don't
+    re-download an unchanging file. Each DatasetDescription re-parses the
+    cached bytes; openpyxl workbooks aren't safely shareable between
+    instances that mutate them.
+    """
+    # a template shipped with the package (named after the link's final
+    # path segment) means offline runs never touch the network at all
+    resource = importlib.resources.files('datamaker.resources').joinpath(
+                    template_link.rsplit('/', 1)[-1].split('?', 1)[0])
+    if resource.is_file():
+        return resource.read_bytes()
+    cache_file = (Path(tempfile.gettempdir()) / 'datamaker'
+                    / 'template-{}.xlsx'.format(hashlib.sha256(template_link.encode()).hexdigest()[:16]))
+    if cache_file.exists():
+        return cache_file.read_bytes()
+    content = fetch_content(template_link, 'application/xlsx')
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_bytes(content)
+    except OSError:
+        pass    # caching is best effort
+    return content
+
+#===============================================================================
+
 """Need to modify this import for integration to map-maker"""
 from datamaker.src.manifest import Manifest
 # from mapmaker.maker import Manifest
@@ -53,28 +126,27 @@ from datamaker.src.manifest import pathlib_path
 
 class VersionMapping:
     def __init__(self):
-        headers = {'Content-Type': 'application/json'}
-        results = requests.request('GET', MAPPING_URL, headers=headers)
-        self.__mappings = json.loads(results.content)
+        self.__mappings = json_loads(cached_mapping())
+        self.__mappings_by_version = {v['version']: v for v in self.__mappings}
 
     @property
     def available_versions(self):
-        return [v['version'] for v in self.__mappings]
+        return list(self.__mappings_by_version)
 
     def get_mapping(self, other_params):
         """
         : other_params: is a dictionary containing other data such as uuid and version
         """
         version = other_params.get('version', None)
-        mapping = None
         if version == None:
             mapping = self.__mappings[0]
         else:
-            for v in self.__mappings:
-                if v['version'] == version:
-                    mapping = v
+            mapping = self.__mappings_by_version.get(version)
         if mapping == None:
             raise SourceError('Dataset-Description version-{} is not available'.format(version))
+        # copy so that patching in other_params below doesn't mutate the
+        # mapping held by this instance
+        mapping = copy.deepcopy(mapping)
         for m in mapping['mapping']:
             if len(m[1])> 0:
                 param = m[1][-1]
@@ -91,12 +163,26 @@ class DatasetDescription:
         """
         self.__mapping = VersionMapping().get_mapping(other_params)
         self.__workbook = self.__load_template_workbook(self.__mapping['template_url'])
-        
+
+        # index the template's row numbers by their key once, rather than
+        # scanning every worksheet row again for each mapping entry
+        self.__worksheet = self.__workbook.worksheets[0]
+        self.__key_rows = {}
+        # values_only iteration over just the first column avoids
+        # materialising a Cell object per template cell
+        for row_index, (key,) in enumerate(
+                self.__worksheet.iter_rows(min_col=1, max_col=1, values_only=True), start=1):
+            if key == None:
+                break
+            # interned keys make the dict lookups in __write_cell pointer
+            # comparisons; casefold matches lower for these ASCII keys
+            self.__key_rows[sys.intern(key.casefold().strip())] = row_index
+
         self.__source_dir = workspace.generated_path
 
         try:
-            with open(workspace.path.joinpath(description_file), 'r') as fd:
-                description = json.loads(fd.read())
+            with open(workspace.path.joinpath(description_file), 'rb') as fd:
+                description = json_loads(fd.read())
         except FileNotFoundError:
             raise FileNotFoundError('Cannot open path: {}'.format(description_file)) from None
         
@@ -107,13 +193,14 @@ class DatasetDescription:
         """
         : template_link: link to dataset_description.xlsx
         """
-        headers = {'Content-Type': 'application/xlsx'}
-        template = requests.request('GET', template_link, headers=headers)
-        workbook = openpyxl.load_workbook(BytesIO(template.content))
+        import openpyxl
+        # keep_links=False skips external-link resolution during parse;
+        # keep_vba and data_only already default to the cheap settings
+        workbook = openpyxl.load_workbook(BytesIO(cached_template(template_link)),
+                                          keep_links=False)
         return workbook
         
     def __write_cell(self, map, description):
-        worksheet = self.__workbook.worksheets[0]
         data_pos = self.__mapping.get('data_pos', 3)
         key, dsc, default = map
         values = default if isinstance(default, list) else [default]
@@ -132,12 +219,9 @@ class DatasetDescription:
             if len(tmp_values) > 0:
                 values = tmp_values if isinstance(tmp_values, list) else [tmp_values]
 
-        for row in worksheet.rows:
-            if row[0].value == None:
-                break
-            if row[0].value.lower().strip() == key:
-                for pos in range(len(values)):
-                    row[pos+data_pos].value = str(values[pos])
+        if (row_index := self.__key_rows.get(sys.intern(key.casefold().strip()))) is not None:
+            for pos in range(len(values)):
+                self.__worksheet.cell(row=row_index, column=pos+data_pos+1, value=str(values[pos]))
 
     def write(self):
         sds_description = (self.__source_dir / 'dataset_description.xlsx').resolve()
@@ -146,6 +230,29 @@ class DatasetDescription:
 
 #===============================================================================
 
+mimetypes.init()    # pay the types-database setup cost once, at import
+
+# The suffixes flatmap sources actually use, resolved without consulting
+# the mimetypes machinery at all (.pptx/.xlsx aren't in every platform's
+# mime.types database)
+_FLATMAP_MIME = {
+    '.json': 'application/json',
+    '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+    '.svg':  'image/svg+xml',
+    '.tsv':  'text/tab-separated-values',
+    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+@functools.lru_cache(maxsize=64)
+def guess_file_type(suffix):
+    # mime type by file suffix; flatmaps use a handful of suffixes so
+    # nearly every lookup is a cache hit
+    if (file_type := _FLATMAP_MIME.get(suffix)) is not None:
+        return file_type
+    return mimetypes.guess_type('x' + suffix, strict=False)[0]
+
+#===============================================================================
+
 @dataclass
 class DatasetFile:
     filename: str
@@ -166,7 +273,9 @@ class DirectoryManifest:
 
     def __init__(self, workspace, metadata_columns=None):
         self.__workspace = workspace
-        self.__path = self.__workspace.path
+        # resolve symlinks in the workspace root once; per-file paths are
+        # then normalised lexically without stat'ing every component
+        self.__path = self.__workspace.path.resolve()
         self.__generated_path = self.__workspace.generated_path
         self.__metadata_columns = metadata_columns if metadata_columns is not None else []
         self.__files = []
@@ -182,19 +291,29 @@ class DirectoryManifest:
         return self.__manifest
 
     def add_file(self, filename, description, **metadata):
-        fullpath = (self.__path / filename).resolve()
-        if not fullpath.exists():
-            raise SourceError(f'Missing file: {fullpath}')
+        fullpath = Path(os.path.normpath(self.__path / filename))
         try:
-            relative_path = fullpath.relative_to(self.__path)
-        except ValueError:
-            raise SourceError(f'Manifest file paths must be relative: {fullpath}') from None
-        file_type = mimetypes.guess_type(fullpath, strict=False)[0]
+            # a single stat() both checks existence and provides the
+            # fallback timestamp below
+            stat_result = os.stat(fullpath)
+        except FileNotFoundError:
+            raise SourceError(f'Missing file: {fullpath}') from None
+        # pure string computation against the pre-resolved root; a path
+        # escaping the workspace shows up as a leading '..' component
+        # (a filename merely starting with dots is fine)
+        relative_path = os.path.relpath(fullpath, self.__path)
+        if relative_path == os.pardir or relative_path.startswith(os.pardir + os.sep):
+            raise SourceError(f'Manifest file paths must be relative: {fullpath}')
+        file_type = guess_file_type(fullpath.suffix.lower())
         if file_type is None:
             file_type = fullpath.suffix
+        timestamp = self.__workspace.last_commit_time(relative_path)
+        if timestamp == '':
+            # file unknown to git (e.g. --ignore-git) -- use its mtime
+            timestamp = datetime.fromtimestamp(stat_result.st_mtime)
         dataset_file = DatasetFile(str(relative_path),
                                    fullpath,
-                                   self.__workspace.last_commit_time(relative_path),
+                                   timestamp,
                                    description,
                                    file_type)
         self.__files.append(dataset_file)
@@ -204,16 +323,20 @@ class DirectoryManifest:
             dataset_file.description,
             dataset_file.file_type
         ]
-        for column_name in self.__metadata_columns:
-            record.append(metadata.get(column_name))
+        record.extend(metadata.get(column_name) for column_name in self.__metadata_columns)
         self.__file_records.append(record)
 
     def write(self):
-        self.__manifest = (self.__generated_path / 'manifest.xlsx').resolve()
-        pandas.DataFrame(
-            self.__file_records,
-            columns = self.COLUMNS + tuple(self.__metadata_columns)
-        ).to_excel(self.__manifest)
+        import openpyxl
+        self.__manifest = self.__generated_path / 'manifest.xlsx'
+        # write-only mode streams rows straight to the output instead of
+        # building an in-memory cell tree for the whole sheet
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet()
+        worksheet.append((None,) + self.COLUMNS + tuple(self.__metadata_columns))
+        for index, record in enumerate(self.__file_records):
+            worksheet.append([index] + record)
+        workbook.save(str(self.__manifest))
 
 #===============================================================================
 
@@ -258,7 +381,7 @@ class FlatmapSource:
         for connectivity_file in manifest.connectivity:
             directory_manifest.add_file(pathlib_path(connectivity_file), 'flatmap connectivity', **metadata)
         for source in manifest.sources:
-            if source['href'].split(':', 1)[0] in ['file']:
+            if source['href'].startswith('file:'):
                 directory_manifest.add_file(pathlib_path(source['href']), 'flatmap source', **metadata)
         # adding manifest.json to directory_manifest
         directory_manifest.add_file(pathlib_path(manifest.url), 'manifest to bult map', **metadata)
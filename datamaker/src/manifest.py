@@ -1,4 +1,6 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import uuid
 import urllib
 import pathlib
@@ -7,14 +9,29 @@ import logging as log
 import os
 import io
 import json
+import shutil
+import tempfile
 from typing import Optional
 from enum import Enum
 import urllib.request
 
 #===============================================================================
 
-import git
-import giturlparse
+# git and giturlparse are imported inside MapRepository -- they're only
+# needed when git state matters (not with --ignore-git) and GitPython is
+# slow to import
+
+try:
+    import orjson
+    json_loads = orjson.loads
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode()
+except ImportError:
+    json_loads = json.loads
+    def json_dumps(obj) -> str:
+        # compact separators match orjson's output so the uuid derived
+        # from this string doesn't depend on which library is installed
+        return json.dumps(obj, sort_keys=True, separators=(',', ':'))
 
 #===============================================================================
 
@@ -32,8 +49,13 @@ class GitState(Enum):
 
 #===============================================================================
 
+_REMOTE_SCHEMES = frozenset(('file', 'http', 'https'))
+
 def relative_path(path: str | pathlib.Path) -> bool:
-    return str(path).split(':', 1)[0] not in ['file', 'http', 'https']
+    # find + slice rather than split: no throwaway list per call
+    s = str(path)
+    i = s.find(':')
+    return i < 0 or s[:i] not in _REMOTE_SCHEMES
 
 def make_uri(path: str | pathlib.Path) -> str:
     return pathlib.Path(os.path.abspath(path)).as_uri() if relative_path(path) else str(path)
@@ -41,6 +63,14 @@ def make_uri(path: str | pathlib.Path) -> str:
 def pathlib_path(path: str) -> pathlib.Path:
     return pathlib.Path(urlparse(path).path)
 
+@functools.lru_cache(maxsize=None)
+def repo_relative_path(repo_path: pathlib.Path, path: str) -> Optional[str]:
+    if path.startswith('file://'):
+        path = path[7:]
+    full_path = pathlib.Path(os.path.abspath(path))
+    if full_path.is_relative_to(repo_path):
+        return str(full_path.relative_to(repo_path))
+
 #===============================================================================
 
 class FilePathError(IOError):
@@ -48,20 +78,36 @@ class FilePathError(IOError):
 
 #===============================================================================
 
+# Remote files fetched ahead of time while the manifest is being checked;
+# FilePath.get_data() consumes entries so nothing is downloaded twice
+_PREFETCHED: dict[str, bytes] = {}
+
+def _prefetch(url: str):
+    try:
+        with urllib.request.urlopen(url) as fp:
+            _PREFETCHED[url] = fp.read()
+    except urllib.error.URLError:
+        pass    # leave the error to the real fetch
+
+#===============================================================================
+
 class MapRepository:
     def __init__(self, working_dir: pathlib.Path):
+        import git
         try:
             self.__repo = git.Repo(working_dir, search_parent_directories=True)     # type:ignore
             self.__repo_path = pathlib.Path(self.__repo.working_dir).absolute()     # type:ignore
-            self.__changed_items = [ item.a_path for item in self.__repo.index.diff(None) ]
-            self.__staged_items = [ item.a_path for item in self.__repo.index.diff('HEAD') ]
-            self.__untracked_files = self.__repo.untracked_files
+            # frozensets make the per-path membership tests in status() O(1)
+            self.__changed_items = frozenset(item.a_path for item in self.__repo.index.diff(None))
+            self.__staged_items = frozenset(item.a_path for item in self.__repo.index.diff('HEAD'))
+            self.__untracked_files = frozenset(self.__repo.untracked_files)
             self.__upstream_base = self.__get_upstream_base()
         except git.InvalidGitRepositoryError:
             raise ValueError("Flatmap sources must be in a git managed directory ('--authoring' or '--ignore-git' option intended?)")
 
     @property
     def remotes(self) -> dict[str, str]:
+        import giturlparse
         return {
             remote.name: giturlparse.parse(remote.url).url2https
                 for remote in self.__repo.remotes
@@ -73,13 +119,10 @@ class MapRepository:
 
     def __git_path(self, path):
         if self.__repo is not None:
-            if path.startswith('file://'):
-                path = path[7:]
-            full_path = pathlib.Path(os.path.abspath(path))
-            if full_path.is_relative_to(self.__repo_path):
-                return str(full_path.relative_to(self.__repo_path))
+            return repo_relative_path(self.__repo_path, path)
 
     def __get_upstream_base(self) -> Optional[str]:
+        import giturlparse
         url = None
         for remote in self.__repo.remotes:
             https_url = giturlparse.parse(remote.url).url2https
@@ -117,6 +160,9 @@ class Manifest:
             self.__repo = MapRepository(pathlib.Path(manifest_path).parent)
         self.__ignore_git = ignore_git
         self.__url = self.__path.url
+        self.__base_dir = self.__url.rsplit('/', 1)[0] + '/'
+        self.__uuid = None
+        self.__normalised_paths = []
         self.__connections = {}
         self.__connectivity = []
         self.__neuron_connectivity = []
@@ -165,6 +211,13 @@ class Manifest:
                 self.__manifest['properties'] = self.__check_and_normalise_path(self.__manifest['properties'])
             for path in self.__manifest.get('connectivity', []):
                 self.__connectivity.append(self.__check_and_normalise_path(path))
+            remote_paths = [path for path in self.__normalised_paths
+                                if path.startswith(('http:', 'https:')) and path.endswith('.json')]
+            if len(remote_paths) > 2:
+                # enough remote files for concurrent downloads to beat
+                # fetching them one at a time as they're first read
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    executor.map(_prefetch, remote_paths)
             if not ignore_git and self.__uncommitted:
                 raise TypeError("Not all of the flatmap's sources are commited into git ('--authoring' or '--ignore-git' option intended?)")
 
@@ -242,12 +295,23 @@ class Manifest:
     @property
     def uuid(self):
         if not self.__ignore_git:
-            return str(uuid.uuid5(uuid.NAMESPACE_URL,
-                                  self.__repo.sha + json.dumps(self.__manifest)))
+            if self.__uuid is None:
+                # serialising the manifest dominates; the sha and manifest
+                # are fixed after __init__ so compute the uuid only once
+                self.__uuid = str(uuid.uuid5(uuid.NAMESPACE_URL,
+                                             self.__repo.sha + json_dumps(self.__manifest)))
+            return self.__uuid
 
     def __check_and_normalise_path(self, path) -> str:
     #=================================================
-        normalised_path = self.__path.join_url(path)
+        # every path joins against the same base so simple relative paths
+        # are just a concatenation; urljoin handles the remaining cases
+        # (absolute URLs and dotted segments)
+        if ':' in path[:8] or path.startswith(('/', '.')) or '/.' in path:
+            normalised_path = self.__path.join_url(path)
+        else:
+            normalised_path = self.__base_dir + path
+        self.__normalised_paths.append(normalised_path)
         if not self.__ignore_git:
             self.__check_committed(normalised_path)
         return normalised_path
@@ -287,6 +351,8 @@ class FilePath(object):
         return self.__url
 
     def get_data(self):
+        if (data := _PREFETCHED.pop(self.__url, None)) is not None:
+            return data
         with self.get_fp() as fp:
             return fp.read()
 
@@ -298,14 +364,19 @@ class FilePath(object):
 
     def get_json(self) -> Any:
         try:
-            return json.loads(self.get_data())
+            return json_loads(self.get_data())
         except json.JSONDecodeError as err:
             raise ValueError('{}: {}'.format(self.__url, err)) from None
 
-    def get_BytesIO(self) -> io.BytesIO:
-        bytesio = io.BytesIO(self.get_data())
-        bytesio.seek(0)
-        return bytesio
+    def get_BytesIO(self) -> io.IOBase:
+        # Stream in chunks rather than materialising the payload twice
+        # (bytes plus buffer); anything over 8MB spills to a temp file so
+        # large sources don't hold their whole content in memory
+        buffer = tempfile.SpooledTemporaryFile(max_size=8 << 20)
+        with self.get_fp() as fp:
+            shutil.copyfileobj(fp, buffer, 1 << 20)
+        buffer.seek(0)
+        return buffer
 
     def join_path(self, path):
         return FilePath(urljoin(self.__url, path))
@@ -24,6 +24,16 @@ import os
 from pathlib import Path
 from urllib.parse import urljoin
 
+try:
+    import orjson
+    json_loads = orjson.loads
+    def json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    json_loads = json.loads
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
 #===============================================================================
 
 from datamaker.src.pptx2svg.pptx2svg import SvgExtractor
@@ -56,7 +66,7 @@ if __name__ == '__main__':
     if args.map_dir:
         manifest_file = os.path.join(args.map_dir, 'manifest.json')
         with open(manifest_file, 'rb') as fp:
-            manifest = json.loads(fp.read())
+            manifest = json_loads(fp.read())
         for source in manifest['sources']:
             if source['kind'] == 'slides':
                 manifest_path = pathlib.Path(manifest_file).absolute().as_posix()
@@ -75,8 +85,8 @@ if __name__ == '__main__':
     # Update an existing manifest
     extractor.update_manifest(manifest)
     manifest_temp_file = os.path.join(args.output_dir, 'manifest.temp')
-    with open(manifest_temp_file, 'w') as output:
-        output.write(json.dumps(manifest, indent=4))
+    with open(manifest_temp_file, 'wb') as output:
+        output.write(json_dumps(manifest))
     manifest_file = os.path.join(args.output_dir, 'manifest.json')
     os.rename(manifest_temp_file, manifest_file)
     print('Manifest saved as `{}`'.format(manifest_file))
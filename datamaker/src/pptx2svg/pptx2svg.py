@@ -23,11 +23,14 @@ __version__ = '1.0.0'
 #===============================================================================
 
 import colorsys
+import functools
+import io
 import os
 import re
 import string
 
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from math import sqrt, sin, cos, acos, pi as PI
 from pathlib import Path
 from zipfile import ZipFile
@@ -66,6 +69,10 @@ POINTS_PER_IN = 72
 PIXELS_PER_IN = 96
 EMU_PER_PIXEL = EMU_PER_IN/PIXELS_PER_IN
 
+# Reciprocals so the per-dimension converters multiply instead of divide
+PIXELS_PER_EMU = PIXELS_PER_IN/EMU_PER_IN
+PIXELS_PER_POINT = PIXELS_PER_IN/POINTS_PER_IN
+
 # Minimum width for a stroked path in points
 MIN_STROKE_WIDTH = 0.5
 
@@ -73,11 +80,11 @@ MIN_STROKE_WIDTH = 0.5
 
 def emu_to_pixels(emu):
 #======================
-    return emu/EMU_PER_PIXEL
+    return emu*PIXELS_PER_EMU
 
 def points_to_pixels(pts):
 #=========================
-    return pts*PIXELS_PER_IN/POINTS_PER_IN
+    return pts*PIXELS_PER_POINT
 
 #===============================================================================
 
@@ -88,6 +95,12 @@ def ellipse_point(a, b, theta):
     circle_radius = sqrt(a_sin_theta**2 + b_cos_theta**2)
     return (a*b_cos_theta/circle_radius, b*a_sin_theta/circle_radius)
 
+def ellipse_points(a, b, thetas):
+#================================
+    # batch form for callers needing several boundary points of the same
+    # ellipse (e.g. both endpoints of an arc) in one call
+    return [ellipse_point(a, b, theta) for theta in thetas]
+
 #===============================================================================
 
 ARROW_MARKERS = {
@@ -120,26 +133,25 @@ def marker_id(marker_def, end):
 
 # Don't set a path id for default shape names
 
-EXCLUDED_NAME_PREFIXES = [
+EXCLUDED_NAME_PREFIXES = (
     'Freeform',
     'Group',
     'Oval',
-]
+)
 
 # Markup that has been deprecated
 
-EXCLUDED_NAME_MARKUP = [
+EXCLUDED_NAME_MARKUP = frozenset([
     '.siblings',
-]
+])
 
-# Check to see if we have a valid name and encode it as an id
+# Check to see if we have a valid name and encode it as an id;
+# shape names repeat across slides so the result is memoised
 
+@functools.lru_cache(maxsize=4096)
 def id_from_name(name):
 #======================
-    if name not in EXCLUDED_NAME_MARKUP:
-        for prefix in EXCLUDED_NAME_PREFIXES:
-            if name.startswith(prefix):
-                return None
+    if name not in EXCLUDED_NAME_MARKUP and not name.startswith(EXCLUDED_NAME_PREFIXES):
         return adobe_encode(name)
     return None
 
@@ -152,40 +164,74 @@ def match_to_hex(m):
             '_' if c in string.whitespace else
             '_x{:02X}_'.format(ord(c)))
 
+# A prebuilt table lets str.translate encode ASCII names in C instead of
+# running the match_to_hex callback once per character
+_ADOBE_TABLE = { c: (chr(c) if chr(c) in (string.ascii_letters + string.digits) else
+                     '_'    if chr(c) in string.whitespace else
+                     '_x{:02X}_'.format(c))
+                    for c in range(128) }
+_ADOBE_TABLE[ord('\n')] = '\n'      # '.' doesn't match newlines, so re.sub left them as-is
+
 def adobe_encode(s):
 #===================
+    if s.isascii():
+        return s.translate(_ADOBE_TABLE)
     return re.sub('.', match_to_hex, s)
 
 #===============================================================================
 
 class Theme(object):
     def __init__(self, pptx_source):
-        with ZipFile(pptx_source, 'r') as presentation:
-            for info in presentation.infolist():
-                if info.filename.startswith('ppt/theme/'):
-                    self.__theme_definition = ThemeDefinition.new(presentation.read(info))
-                    break
+        if isinstance(pptx_source, ZipFile):
+            # share a caller's open archive -- no second parse of the
+            # pptx's central directory
+            self.__load_theme(pptx_source)
+        else:
+            with ZipFile(pptx_source, 'r') as presentation:
+                self.__load_theme(presentation)
+
+    def __load_theme(self, presentation):
+    #====================================
+        # namelist() is already cached by ZipFile; no ZipInfo objects needed
+        for name in presentation.namelist():
+            if name.startswith('ppt/theme/'):
+                self.__theme_definition = ThemeDefinition.new(presentation.read(name))
+                break
+        self.__colour_defs = None
 
     def colour_scheme(self):
     #=======================
         return self.__theme_definition.themeElements.clrScheme
 
+    def colour_defs(self):
+    #=====================
+        # The theme is shared by every slide, so its colour scheme is
+        # parsed into RGB values just once
+        if self.__colour_defs is None:
+            defs = {}
+            for colour_def in self.colour_scheme():
+                defn = colour_def[0]
+                if defn.tag == _SYS_CLR:
+                    defs[colour_def.tag] = RGBColor.from_string(defn.attrib['lastClr'])
+                elif defn.tag == _SRGB_CLR:
+                    defs[colour_def.tag] = RGBColor.from_string(defn.val)
+            self.__colour_defs = defs
+        return self.__colour_defs
+
 #===============================================================================
 
+_SYS_CLR = DML('sysClr')
+_SRGB_CLR = DML('srgbClr')
+
 class ColourMap(object):
     def __init__(self, ppt_theme, slide):
-        self.__colour_defs = {}
-        for colour_def in ppt_theme.colour_scheme():
-            defn = colour_def[0]
-            if defn.tag == DML('sysClr'):
-                self.__colour_defs[colour_def.tag] = RGBColor.from_string(defn.attrib['lastClr'])
-            elif defn.tag == DML('srgbClr'):
-                self.__colour_defs[colour_def.tag] = RGBColor.from_string(defn.val)
+        self.__colour_defs = dict(ppt_theme.colour_defs())
         # The slide's layout master can have colour aliases
         colour_map = slide.slide_layout.slide_master.element.clrMap.attrib
         for key, value in colour_map.items():
             if key != value:
                 self.__colour_defs[DML(key)] = self.__colour_defs[DML(value)]
+        self.__resolved = {}
 
     def lookup(self, colour_format):
     #===============================
@@ -199,47 +245,55 @@ class ColourMap(object):
         lumMod = colour_format.lumMod
         lumOff = colour_format.lumOff
         satMod = colour_format.satMod
-        if lumMod != 1.0 or lumOff != 0.0 or satMod != 1.0:
-            hls = list(colorsys.rgb_to_hls(*(np.array(rgb)/255.0)))
-            hls[1] *= lumMod
-            hls[1] += lumOff
-            if hls[1] > 1.0:
-                hls[1] = 1.0
-            hls[2] *= satMod
-            if hls[2] > 1.0:
-                hls[2] = 1.0
-            colour = np.uint8(255*np.array(colorsys.hls_to_rgb(*hls)) + 0.5)
-            rgb = RGBColor(*colour.tolist())
         tint = colour_format.tint
-        if tint > 0.0:
-            colour = np.array(rgb)
-            tinted = np.uint8((colour + tint*(255 - colour)))
-            rgb = RGBColor(*colour.tolist())
         shade = colour_format.shade
+        # shapes draw from a small palette, so the adjusted colour has
+        # nearly always been resolved before
+        cache_key = (rgb, lumMod, lumOff, satMod, tint, shade)
+        if (resolved := self.__resolved.get(cache_key)) is not None:
+            return resolved
+        if lumMod != 1.0 or lumOff != 0.0 or satMod != 1.0:
+            # plain scalar arithmetic -- numpy array round-trips cost more
+            # than the three-component maths they wrapped
+            h, l, s = colorsys.rgb_to_hls(rgb[0]/255.0, rgb[1]/255.0, rgb[2]/255.0)
+            l = min(1.0, l*lumMod + lumOff)
+            s = min(1.0, s*satMod)
+            r, g, b = colorsys.hls_to_rgb(h, l, s)
+            rgb = RGBColor(int(255*r + 0.5), int(255*g + 0.5), int(255*b + 0.5))
+        if tint > 0.0:
+            rgb = RGBColor(int(rgb[0] + tint*(255 - rgb[0])),
+                           int(rgb[1] + tint*(255 - rgb[1])),
+                           int(rgb[2] + tint*(255 - rgb[2])))
         if shade != 1.0:
-            shaded = np.uint8(shade*np.array(rgb))
-            rgb = RGBColor(*shaded.tolist())
-        return '#{}'.format(str(rgb))
+            rgb = RGBColor(int(shade*rgb[0]), int(shade*rgb[1]), int(shade*rgb[2]))
+        resolved = '#{}'.format(str(rgb))
+        self.__resolved[cache_key] = resolved
+        return resolved
 
 #===============================================================================
 
+_FILL_TO_RECT = DML('fillToRect')
+_TILE_RECT = DML('tileRect')
+
 class Gradient(object):
     def __init__(self, dwg, id, shape, colour_map):
         self.__id = 'gradient-{}'.format(id)
         fill = shape.fill
         gradient = None
-        if fill._fill._gradFill.path is None:
+        # each _gradFill access goes through python-pptx's property
+        # descriptors, so fetch it once
+        grad_fill = fill._fill._gradFill
+        if grad_fill.path is None:
             gradient = svgwrite.gradients.LinearGradient(id=self.__id)
             rotation = fill.gradient_angle
-            if ('rotWithShape' in fill._fill._gradFill.attrib
-             and fill._fill._gradFill.attrib['rotWithShape'] == '1'):
+            if grad_fill.attrib.get('rotWithShape') == '1':
                 rotation += shape.rotation
             if rotation != 0:
                 gradient.rotate(rotation % 360, (0.5, 0.5))
 
-        elif fill._fill._gradFill.path.attrib['path'] == 'circle':
-                fill_to = fill._fill._gradFill.path.find('{http://schemas.openxmlformats.org/drawingml/2006/main}fillToRect').attrib
-                tileRect = fill._fill._gradFill.find('{http://schemas.openxmlformats.org/drawingml/2006/main}tileRect')
+        elif grad_fill.path.attrib['path'] == 'circle':
+                fill_to = grad_fill.path.find(_FILL_TO_RECT).attrib
+                tileRect = grad_fill.find(_TILE_RECT)
                 tile = tileRect.attrib if tileRect is not None else {}
                 cx = (float(fill_to['l']) if 'l' in fill_to else float(fill_to['r']) + float(tile.get('l', 0.0)))/100000.0
                 cy = (float(fill_to['t']) if 't' in fill_to else float(fill_to['b']) + float(tile.get('t', 0.0)))/100000.0
@@ -266,7 +320,7 @@ class Gradient(object):
                 if shape.width != shape.height:
                     gradient.scale(scale_x, scale_y)
 
-        elif fill._fill._gradFill.path.attrib['path'] == 'rect':
+        elif grad_fill.path.attrib['path'] == 'rect':
             print('Rect fill ignored for', shape.name)
             return
 
@@ -303,20 +357,22 @@ class DrawMLTransform(object):
         theta = xfrm.rot*PI/180.0
         Fx = -1 if xfrm.flipH else 1
         Fy = -1 if xfrm.flipV else 1
-        T_st = np.array([[Dx_/Dx,      0, Bx_ - (Dx_/Dx)*Bx] if Dx != 0 else [1, 0, Bx_],
-                         [     0, Dy_/Dy, By_ - (Dy_/Dy)*By] if Dy != 0 else [0, 1, By_],
-                         [     0,      0,                 1]])
-        U = np.array([[1, 0, -(Bx_ + Dx_/2.0)],
-                      [0, 1, -(By_ + Dy_/2.0)],
-                      [0, 0,                1]])
-        R = np.array([[cos(theta), -sin(theta), 0],
-                      [sin(theta),  cos(theta), 0],
-                      [0,                    0, 1]])
-        Flip = np.array([[Fx,  0, 0],
-                         [ 0, Fy, 0],
-                         [ 0,  0, 1]])
-        T_rf = np.linalg.inv(U)@R@Flip@U
-        self.__T = T_rf@T_st
+        # Closed form of inv(U)@R@Flip@U @ T_st: a scale/translate into the
+        # shape's frame followed by rotation and flips about its centre, so
+        # the six affine coefficients follow directly without the five
+        # matrix temporaries and the LAPACK inverse
+        (sx, ex) = (Dx_/Dx, Bx_ - (Dx_/Dx)*Bx) if Dx != 0 else (1.0, Bx_)
+        (sy, ey) = (Dy_/Dy, By_ - (Dy_/Dy)*By) if Dy != 0 else (1.0, By_)
+        (ct, st) = (cos(theta), sin(theta))
+        (a, b) = (ct*Fx, -st*Fy)
+        (c, d) = (st*Fx,  ct*Fy)
+        cx = Bx_ + Dx_/2.0
+        cy = By_ + Dy_/2.0
+        tx = cx - a*cx - b*cy
+        ty = cy - c*cx - d*cy
+        self.__T = np.array([[a*sx, b*sy, a*ex + b*ey + tx],
+                             [c*sx, d*sy, c*ex + d*ey + ty],
+                             [ 0.0,  0.0,               1.0]])
 
     def matrix(self):
         return self.__T
@@ -326,6 +382,11 @@ class DrawMLTransform(object):
 class Transform(object):
     def __init__(self, matrix):
         self.__matrix = np.array(matrix)
+        self.__decomposition = None
+        # flattened affine coefficients; transform_point runs per path
+        # vertex and six float operations beat a numpy matmul there
+        ((self.__a, self.__b, self.__c),
+         (self.__d, self.__e, self.__f)) = self.__matrix[:2].tolist()
 
     def __matmul__(self, matrix):
         return Transform(self.__matrix@np.array(matrix))
@@ -333,29 +394,77 @@ class Transform(object):
     def __str__(self):
         return str(self.__matrix)
 
+    def __decompose(self):
+    #=====================
+        # The matrix never changes, so the decomposition (and the angle
+        # and scales derived from it) is computed at most once
+        if self.__decomposition is None:
+            rotation, scaling = transforms3d.affines.decompose(self.__matrix)[1:3]
+            theta = acos(rotation[0, 0])
+            if rotation[0, 1] >= 0:
+                theta = 2*PI - theta
+            self.__decomposition = (theta, float(scaling[0]), float(scaling[1]))
+        return self.__decomposition
+
     def rotate_angle(self, angle):
     #==============================
-        rotation = transforms3d.affines.decompose(self.__matrix)[1]
-        theta = acos(rotation[0, 0])
-        if rotation[0, 1] >= 0:
-            theta = 2*PI - theta
-        angle = angle + theta
+        angle = angle + self.__decompose()[0]
         while angle >= 2*PI:
             angle -= 2*PI
         return angle
 
     def scale_length(self, length):
     #==============================
-        scaling = transforms3d.affines.decompose(self.__matrix)[2]
-        return (scaling[0]*length[0], scaling[1]*length[1])
+        (_, scale_x, scale_y) = self.__decompose()
+        return (scale_x*length[0], scale_y*length[1])
 
     def transform_point(self, point):
     #================================
-        return (self.__matrix@[point[0], point[1], 1.0])[:2]
+        (x, y) = point
+        return (self.__a*x + self.__b*y + self.__c,
+                self.__d*x + self.__e*y + self.__f)
+
+    def transform_points(self, points):
+    #==================================
+        # flat coordinate list ready for svg_path.push(); one method call
+        # per path element rather than one per point
+        (a, b, c) = (self.__a, self.__b, self.__c)
+        (d, e, f) = (self.__d, self.__e, self.__f)
+        return [coord for (x, y) in points
+                          for coord in (a*x + b*y + c, d*x + e*y + f)]
 
 #===============================================================================
 
+# Both notes-text directives in one alternation so a single regex pass
+# over the notes replaces two match attempts per token; the lookbehind
+# stops e.g. `grid(...)` from being read as an `id` directive
+_NOTES_RE = re.compile(r'(?<!\w)(id|models) *\(([^)]*)\)')
+
+# Dash patterns as multiples of the stroke width
+_DASH_PATTERNS = {
+    MSO_LINE_DASH_STYLE.DASH: (4,),
+    MSO_LINE_DASH_STYLE.DASH_DOT: (4, 1, 1, 1),
+    MSO_LINE_DASH_STYLE.LONG_DASH: (4, 1),
+    MSO_LINE_DASH_STYLE.SQUARE_DOT: (2, 1),
+}
+
+class _PathState(object):
+    # Mutable drawing state shared between the path-element handlers;
+    # d_parts collects path commands for a single join at the end instead
+    # of pushing through svgwrite's per-call argument formatting
+    __slots__ = ('current_point', 'closed', 'd_parts')
+    def __init__(self):
+        self.current_point = None
+        self.closed = False
+        self.d_parts = []
+
 class SvgLayer(object):
+    # One instance per slide, so slots save a per-layer __dict__
+    __slots__ = ('_SvgLayer__slide', '_SvgLayer__colour_map', '_SvgLayer__dwg',
+                 '_SvgLayer__id', '_SvgLayer__models', '_SvgLayer__filename',
+                 '_SvgLayer__gradient_id', '_SvgLayer__quiet',
+                 '_SvgLayer__path_handlers')
+
     def __init__(self, size, slide, slide_number, ppt_theme, quiet=False):
         self.__slide = slide
         self.__colour_map = ColourMap(ppt_theme, slide)
@@ -367,18 +476,26 @@ class SvgLayer(object):
             notes_slide = slide.notes_slide
             notes_text = notes_slide.notes_text_frame.text
             if notes_text.startswith('.'):
-                for part in notes_text[1:].split():
-                    id_match = re.match('id *\((.*)\)', part)
-                    if id_match is not None:
-                        self.__id = id_match[1].strip()
-                    models_match = re.match('models *\((.*)\)', part)
-                    if models_match is not None:
-                        self.__models = models_match[1].strip()
+                for match in _NOTES_RE.finditer(notes_text[1:]):
+                    if match[1] == 'id':
+                        self.__id = match[2].strip()
+                    else:
+                        self.__models = match[2].strip()
         if self.__id is None:
             self.__id = 'slide-{:02d}'.format(slide_number)
         self.__filename = '{}.svg'.format(self.__id)
         self.__gradient_id = 0
         self.__quiet =  quiet
+        # O(1) dispatch on a path element's tag instead of a chain of
+        # string comparisons (each of which rebuilt the namespaced tag)
+        self.__path_handlers = {
+            DML('arcTo'): self.__path_arcTo,
+            DML('close'): self.__path_close,
+            DML('cubicBezTo'): self.__path_cubicBezTo,
+            DML('lnTo'): self.__path_lnTo,
+            DML('moveTo'): self.__path_moveTo,
+            DML('quadBezTo'): self.__path_quadBezTo,
+        }
 
     @property
     def filename(self):
@@ -394,8 +511,12 @@ class SvgLayer(object):
 
     def save(self, output_dir):
     #==========================
+        # serialise into memory and write in one go; pretty-printing adds
+        # indentation work and output size for a machine-read file
+        buffer = io.StringIO()
+        self.__dwg.write(buffer, pretty=False)
         with open(os.path.join(output_dir, self.__filename), 'w', encoding='utf-8') as f:
-            self.__dwg.write(f, pretty=True, indent=4)
+            f.write(buffer.getvalue())
 
     def process(self, transform):
     #============================
@@ -431,6 +552,53 @@ class SvgLayer(object):
         if show_progress:
             progress_bar.close()
 
+    def __path_arcTo(self, c, geometry, T, state):
+    #=============================================
+        wR = geometry.attrib_value(c, 'wR')
+        hR = geometry.attrib_value(c, 'hR')
+        stAng = radians(geometry.attrib_value(c, 'stAng'))
+        swAng = radians(geometry.attrib_value(c, 'swAng'))
+        (p1, p2) = ellipse_points(wR, hR, (stAng, stAng + swAng))
+        current_point = state.current_point
+        pt = (current_point[0] - p1[0] + p2[0],
+              current_point[1] - p1[1] + p2[1])
+        phi = T.rotate_angle(0)
+        (rx, ry) = T.scale_length((wR, hR))
+        (x, y) = T.transform_point(pt)
+        state.d_parts.append(f'A {rx:.3f} {ry:.3f} {180*phi/PI:.3f} 0 1 {x:.3f} {y:.3f}')
+        state.current_point = pt
+
+    def __path_close(self, c, geometry, T, state):
+    #=============================================
+        state.d_parts.append('Z')
+        state.closed = True
+
+    def __path_cubicBezTo(self, c, geometry, T, state):
+    #==================================================
+        pts = [geometry.point(p) for p in c]
+        state.d_parts.append('C ' + ' '.join(f'{coord:.3f}' for coord in T.transform_points(pts)))
+        state.current_point = pts[-1]
+
+    def __path_lnTo(self, c, geometry, T, state):
+    #============================================
+        pt = geometry.point(c.pt)
+        (x, y) = T.transform_point(pt)
+        state.d_parts.append(f'L {x:.3f} {y:.3f}')
+        state.current_point = pt
+
+    def __path_moveTo(self, c, geometry, T, state):
+    #==============================================
+        pt = geometry.point(c.pt)
+        (x, y) = T.transform_point(pt)
+        state.d_parts.append(f'M {x:.3f} {y:.3f}')
+        state.current_point = pt
+
+    def __path_quadBezTo(self, c, geometry, T, state):
+    #=================================================
+        pts = [geometry.point(p) for p in c]
+        state.d_parts.append('Q ' + ' '.join(f'{coord:.3f}' for coord in T.transform_points(pts)))
+        state.current_point = pts[-1]
+
     def process_shape(self, shape, svg_parent, transform):
     #=====================================================
         id = id_from_name(shape.name)
@@ -443,102 +611,67 @@ class SvgLayer(object):
             svg_parent = group
             id = None
 
+        # None of these vary between the paths of a shape, so resolve the
+        # python-pptx property chains once rather than per path
+        is_connector = isinstance(shape, pptx.shapes.connector.Connector)
+        # connectors have no fill property
+        fill_type = shape.fill.type if not is_connector else None
+        line_fill_type = shape.line.fill.type
+        dash_style = shape.line.dash_style
+        stroke_width = points_to_pixels(max(Length(shape.line.width).pt, MIN_STROKE_WIDTH))
+
         for path in geometry.path_list:
             svg_path = self.__dwg.path(fill='none', class_='non-scaling-stroke')
             if id is not None:
                 svg_path.attribs['id'] = id
             bbox = (shape.width, shape.height) if path.w is None else (path.w, path.h)
             T = transform@DrawMLTransform(shape, bbox).matrix()
-            current_point = None
-            closed = False
-            for c in path.getchildren():
-                if   c.tag == DML('arcTo'):
-                    wR = geometry.attrib_value(c, 'wR')
-                    hR = geometry.attrib_value(c, 'hR')
-                    stAng = radians(geometry.attrib_value(c, 'stAng'))
-                    swAng = radians(geometry.attrib_value(c, 'swAng'))
-                    p1 = ellipse_point(wR, hR, stAng)
-                    p2 = ellipse_point(wR, hR, stAng + swAng)
-                    pt = (current_point[0] - p1[0] + p2[0],
-                          current_point[1] - p1[1] + p2[1])
-                    phi = T.rotate_angle(0)
-                    large_arc_flag = 0
-                    svg_path.push('A', *T.scale_length((wR, hR)),
-                                       180*phi/PI, large_arc_flag, 1,
-                                       *T.transform_point(pt))
-                    current_point = pt
-                elif c.tag == DML('close'):
-                    svg_path.push('Z')
-                    closed = True
-                elif c.tag == DML('cubicBezTo'):
-                    coords = []
-                    for p in c.getchildren():
-                        pt = geometry.point(p)
-                        coords.extend(T.transform_point(pt))
-                        current_point = pt
-                    svg_path.push('C', *coords)
-                elif c.tag == DML('lnTo'):
-                    pt = geometry.point(c.pt)
-                    coords = T.transform_point(pt)
-                    svg_path.push('L', *coords)
-                    current_point = pt
-                elif c.tag == DML('moveTo'):
-                    pt = geometry.point(c.pt)
-                    coords = T.transform_point(pt)
-                    svg_path.push('M', *coords)
-                    current_point = pt
-                elif c.tag == DML('quadBezTo'):
-                    coords = []
-                    for p in c.getchildren():
-                        pt = geometry.point(p)
-                        coords.extend(T.transform_point(pt))
-                        current_point = pt
-                    svg_path.push('Q', *coords)
+            state = _PathState()
+            for c in path:
+                if (handler := self.__path_handlers.get(c.tag)) is not None:
+                    handler(c, geometry, T, state)
                 else:
                     print('Unknown path element: {}'.format(c.tag))
+            # a single pre-joined command string; svgwrite rebuilds the d
+            # attribute from commands at serialisation time, so assigning
+            # attribs['d'] directly would be overwritten
+            svg_path.push(' '.join(state.d_parts))
 
-            if not isinstance(shape, pptx.shapes.connector.Connector):
-                if shape.fill.type == MSO_FILL_TYPE.SOLID:
+            if not is_connector:
+                if fill_type == MSO_FILL_TYPE.SOLID:
                     svg_path.attribs['fill'] = self.__colour_map.lookup(shape.fill.fore_color)
                     alpha = shape.fill.fore_color.alpha
                     if alpha < 1.0:
                         svg_path.attribs['opacity'] = alpha
-                elif shape.fill.type == MSO_FILL_TYPE.GRADIENT:
+                elif fill_type == MSO_FILL_TYPE.GRADIENT:
                     self.__gradient_id += 1
                     gradient = Gradient(self.__dwg, self.__gradient_id, shape, self.__colour_map)
                     svg_path.attribs['fill'] = gradient.url
-                elif shape.fill.type is None:
+                elif fill_type is None:
                     svg_path.attribs['fill'] = '#FF0000'
                     svg_path.attribs['opacity'] = 1.0
-                elif shape.fill.type == MSO_FILL_TYPE.GROUP:
+                elif fill_type == MSO_FILL_TYPE.GROUP:
                     # WIP Needs to get group's fill
                     print('Group fill ignored for ', shape.name)
-                elif shape.fill.type != MSO_FILL_TYPE.BACKGROUND:
-                    print('Unsupported fill type: {}'.format(shape.fill.type))
+                elif fill_type != MSO_FILL_TYPE.BACKGROUND:
+                    print('Unsupported fill type: {}'.format(fill_type))
 
-            if shape.line.fill.type == MSO_FILL_TYPE.SOLID:
+            if line_fill_type == MSO_FILL_TYPE.SOLID:
                 svg_path.attribs['stroke'] = self.__colour_map.lookup(shape.line.color)
                 alpha = shape.line.fill.fore_color.alpha
                 if alpha < 1.0:
                     svg_path.attribs['stroke-opacity'] = alpha
-            elif shape.line.fill.type is None:
+            elif line_fill_type is None:
                 svg_path.attribs['stroke'] = '#000000'
-            elif shape.line.fill.type != MSO_FILL_TYPE.BACKGROUND:
-                print('Unsupported line fill type: {}'.format(shape.line.fill.type))
+            elif line_fill_type != MSO_FILL_TYPE.BACKGROUND:
+                print('Unsupported line fill type: {}'.format(line_fill_type))
 
-            stroke_width = points_to_pixels(max(Length(shape.line.width).pt, MIN_STROKE_WIDTH))
             svg_path.attribs['stroke-width'] = stroke_width
-            if shape.line.dash_style is not None:
-                if shape.line.dash_style == MSO_LINE_DASH_STYLE.DASH:
-                    svg_path.attribs['stroke-dasharray'] = 4*stroke_width
-                elif shape.line.dash_style == MSO_LINE_DASH_STYLE.DASH_DOT:
-                    svg_path.attribs['stroke-dasharray'] = '{} {} {} {}'.format(4*stroke_width, stroke_width, stroke_width, stroke_width)
-                elif shape.line.dash_style == MSO_LINE_DASH_STYLE.LONG_DASH:
-                    svg_path.attribs['stroke-dasharray'] = '{} {}'.format(4*stroke_width, stroke_width)
-                elif shape.line.dash_style == MSO_LINE_DASH_STYLE.SQUARE_DOT:
-                    svg_path.attribs['stroke-dasharray'] = '{} {}'.format(2*stroke_width, stroke_width)
-                elif shape.line.dash_style != MSO_LINE_DASH_STYLE.SOLID:
-                    print('Unsupported line dash style: {}'.format(shape.line.dash_style))
+            if dash_style is not None and dash_style != MSO_LINE_DASH_STYLE.SOLID:
+                if (dashes := _DASH_PATTERNS.get(dash_style)) is not None:
+                    svg_path.attribs['stroke-dasharray'] = ' '.join(str(d*stroke_width) for d in dashes)
+                else:
+                    print('Unsupported line dash style: {}'.format(dash_style))
 
 ## WIP      if 'type' in shape.line.headEnd or 'type' in shape.line.tailEnd:
 ## WIP          svg_path.set_markers((marker_id(shape.line.headEnd, 'head'),
@@ -549,8 +682,45 @@ class SvgLayer(object):
 
 #===============================================================================
 
+def _write_debug_xml(path, xml):
+#===============================
+    with open(path, 'w') as output:
+        output.write(xml)
+
+#===============================================================================
+
+def render_slide(powerpoint, slide_number, output_dir, debug=False):
+#===================================================================
+    # Module level so it can run in a worker process; presentations and
+    # themes don't pickle, so each worker opens its own copies
+    pptx = Presentation(powerpoint)
+    theme = Theme(powerpoint)
+    transform = Transform([[1.0/EMU_PER_PIXEL,                 0, 0],
+                           [                0, 1.0/EMU_PER_PIXEL, 0],
+                           [                0,                 0, 1]])
+    svg_size = transform.transform_point((pptx.slide_width, pptx.slide_height))
+    slide = pptx.slides[slide_number - 1]
+    if debug:
+        with open(os.path.join(output_dir, 'slide-{:02d}.xml'.format(slide_number)), 'w') as xml:
+            xml.write(slide.element.xml)
+    layer = SvgLayer(svg_size, slide, slide_number, theme, quiet=True)
+    layer.process(transform)
+    layer.save(output_dir)
+    return (layer.id, layer.filename, layer.models)
+
+#===============================================================================
+
 class SvgExtractor(object):
+    __slots__ = ('_SvgExtractor__powerpoint', '_SvgExtractor__pptx',
+                 '_SvgExtractor__theme', '_SvgExtractor__slides',
+                 '_SvgExtractor__transform', '_SvgExtractor__svg_size',
+                 '_SvgExtractor__output_dir', '_SvgExtractor__debug',
+                 '_SvgExtractor__quiet', '_SvgExtractor__saved_svg',
+                 '_SvgExtractor__id', '_SvgExtractor__models',
+                 '_SvgExtractor__debug_writer')
+
     def __init__(self, options):
+        self.__powerpoint = options.powerpoint
         self.__pptx = Presentation(options.powerpoint)
         self.__theme = Theme(options.powerpoint)
         self.__slides = self.__pptx.slides
@@ -565,6 +735,9 @@ class SvgExtractor(object):
         self.__saved_svg = OrderedDict()
         self.__id = Path(options.powerpoint).name.split('.')[0].replace(' ', '_')
         self.__models = None
+        # Debug XML is written by a background thread so slide rendering
+        # isn't blocked on disk I/O
+        self.__debug_writer = ThreadPoolExecutor(max_workers=1) if self.__debug else None
 
     @property
     def id(self):
@@ -577,8 +750,9 @@ class SvgExtractor(object):
     def slide_to_svg(self, slide, slide_number):
     #===========================================
         if self.__debug:
-            with open(os.path.join(self.__output_dir, 'slide-{:02d}.xml'.format(slide_number)), 'w') as xml:
-                xml.write(slide.element.xml)
+            self.__debug_writer.submit(_write_debug_xml,
+                os.path.join(self.__output_dir, 'slide-{:02d}.xml'.format(slide_number)),
+                slide.element.xml)
         layer = SvgLayer(self.__svg_size, slide, slide_number, self.__theme, self.__quiet)
         layer.process(self.__transform)
         layer.save(self.__output_dir)
@@ -590,8 +764,29 @@ class SvgExtractor(object):
 
     def slides_to_svg(self):
     #=======================
-        for n, slide in enumerate(self.__slides):
-            self.slide_to_svg(slide, n+1)
+        slide_count = len(self.__slides)
+        if self.__quiet or slide_count < 2:
+            for n, slide in enumerate(self.__slides):
+                self.slide_to_svg(slide, n+1)
+            if self.__debug_writer is not None:
+                self.__debug_writer.shutdown(wait=True)
+            return
+        # SVG construction is CPU-bound pure Python with no state shared
+        # between slides, so render them in worker processes; results are
+        # consumed in slide order to keep saved_svg deterministic
+        with ProcessPoolExecutor(max_workers=min(slide_count, os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(render_slide, self.__powerpoint, slide_number,
+                                       self.__output_dir, self.__debug)
+                          for slide_number in range(1, slide_count + 1)]
+            # workers run quiet, so show per-slide progress here instead
+            # of the per-shape bars of the serial path
+            for slide_number, future in enumerate(tqdm(futures, unit='slide'), start=1):
+                (id, filename, models) = future.result()
+                self.__saved_svg[id] = filename
+                if slide_number == 1:
+                    if not id.startswith('slide-'):
+                        self.__id = id
+                    self.__models = models
 
     def update_manifest(self, manifest):
     #===================================
@@ -601,13 +796,11 @@ class SvgExtractor(object):
             manifest['models'] = self.__models
         sources = [ source for source in manifest['sources']
                         if source['kind'] != 'slides']
-        next_kind = 'base'
-        for id, filename in self.__saved_svg.items():
-            sources.append(OrderedDict(
-                id=id,
-                href=filename,
-                kind=next_kind
-            ))
-            if next_kind == 'base':
-                next_kind = 'details'
+        # first slide is the base layer, every other slide is a detail layer
+        kinds = ['base'] + ['details']*(len(self.__saved_svg) - 1)
+        sources.extend(OrderedDict(
+            id=id,
+            href=filename,
+            kind=kind
+        ) for (id, filename), kind in zip(self.__saved_svg.items(), kinds))
         manifest['sources'] = sources
\ No newline at end of file
@@ -1,7 +1,9 @@
+import mmap
 import os
+import shutil
+import tempfile
 import urllib.request
 import zipfile
-import io
 from urllib.parse import urlparse
 import re
 from json import JSONDecodeError
@@ -13,10 +15,17 @@ def get_list_of_folder(directory):
     return folders
 
 def extract_url_zip(url, destination):
-    with urllib.request.urlopen(url) as response:
-        zip_bytes = io.BytesIO(response.read())
-    with zipfile.ZipFile(zip_bytes, 'r') as zip_ref:
-        zip_ref.extractall(destination)
+    # stream the download to a temporary file so memory use stays constant
+    # whatever the archive size
+    with urllib.request.urlopen(url) as response, \
+         tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as tmp:
+        shutil.copyfileobj(response, tmp, length=1 << 20)
+        tmp_path = tmp.name
+    try:
+        with zipfile.ZipFile(tmp_path, 'r') as zip_ref:
+            zip_ref.extractall(destination)
+    finally:
+        os.unlink(tmp_path)
 
 def is_url(string):
     parsed_url = urlparse(string)
@@ -27,20 +36,29 @@ def is_file_path(string):
     return parsed_url.scheme == '' and parsed_url.netloc == ''
 
 # these should be a temporary functions
+_MAPMAKER_RE = re.compile(rb'Mapmaker[^\n]*')
+_MAPKNOWLEDGE_RE = re.compile(rb'Map Knowledge version[^\n]*')
+_VERSION_RE = re.compile(r"version (\d+\.\d+\.\d+)")
+
+def _search_log(logfile, pattern):
+    # memory-map the log and search it in one pass rather than
+    # decoding and scanning line by line
+    with open(logfile, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if (match := pattern.search(data)) is not None:
+                    return match.group(0).decode()
+        except ValueError:      # empty file
+            pass
+
 def get_mapmaker_version(logfile):
-    with open(logfile, 'r') as f:
-        for line in f:
-            if 'Mapmaker' in line:
-                return line[line.index('Mapmaker'):].strip()
+    if (line := _search_log(logfile, _MAPMAKER_RE)) is not None:
+        return line.strip()
 
 def get_mapknowledge_version(logfile):
-    with open(logfile, 'r') as f:
-        for line in f:
-            if 'Map Knowledge version' in line:
-                pattern = r"version (\d+\.\d+\.\d+)"
-                match = re.search(pattern, line)
-                if match:
-                    return 'Map Knowledge ' + match.group(1)
+    if (line := _search_log(logfile, _MAPKNOWLEDGE_RE)) is not None:
+        if (version := _VERSION_RE.search(line)) is not None:
+            return 'Map Knowledge ' + version.group(1)
 
 #===============================================================================
 
@@ -60,6 +78,13 @@ LOOKUP_TIMEOUT = 30    # seconds; for `requests.get()`
 
 #===============================================================================
 
+# A shared session reuses connections between lookups instead of doing a
+# fresh TLS handshake per request
+_SESSION = requests.Session()
+_SESSION.headers.update({'Accept': 'application/json'})
+
+#===============================================================================
+
 def get_sckan_version(scicrunch_release=SCICRUNCH_PRODUCTION):
     scicrunch_key = os.environ.get('SCICRUNCH_API_KEY')
     if scicrunch_key is not None:
@@ -83,8 +108,7 @@ def get_sckan_version(scicrunch_release=SCICRUNCH_PRODUCTION):
 
 def request_json(endpoint, **kwds):
     try:
-        response = requests.get(endpoint,
-                                headers={'Accept': 'application/json'},
+        response = _SESSION.get(endpoint,
                                 timeout=LOOKUP_TIMEOUT,
                                 **kwds)
         if response.status_code == requests.codes.ok:
@@ -49,16 +49,36 @@ class Workspace:
         self.repository.set_head(commit_id.id)
         self.__commit_times = {}
         last_commit = self.repository[self.repository.head.target]
-        for commit in self.repository.walk(last_commit.id,
-                pygit2.GIT_SORT_TIME | pygit2.GIT_SORT_TOPOLOGICAL):
-            tzinfo = timezone(timedelta(minutes=commit.author.offset))
-            commit_time = datetime.fromtimestamp(float(commit.author.time), tzinfo)
-            for file in commit.tree:
-                if file.name not in self.__commit_times:
-                    self.__commit_times[file.name] = commit_time
-                elif not ignore_git:# check ignore_git
-                    self.close()
-                    raise Exception(f'{file.name} in {workspace} is not commited') from None
+        if ignore_git:
+            # Only files in the checked-out tree are ever queried, so stop
+            # walking once each has a time; commits whose tree is identical
+            # to the previous one can't contribute anything new
+            pending = {file.name for file in last_commit.tree}
+            previous_tree_id = None
+            for commit in self.repository.walk(last_commit.id,
+                    pygit2.GIT_SORT_TIME | pygit2.GIT_SORT_TOPOLOGICAL):
+                if not pending:
+                    break
+                if commit.tree_id == previous_tree_id:
+                    continue
+                previous_tree_id = commit.tree_id
+                tzinfo = timezone(timedelta(minutes=commit.author.offset))
+                commit_time = datetime.fromtimestamp(float(commit.author.time), tzinfo)
+                for file in commit.tree:
+                    if file.name in pending:
+                        self.__commit_times[file.name] = commit_time
+                        pending.discard(file.name)
+        else:
+            for commit in self.repository.walk(last_commit.id,
+                    pygit2.GIT_SORT_TIME | pygit2.GIT_SORT_TOPOLOGICAL):
+                tzinfo = timezone(timedelta(minutes=commit.author.offset))
+                commit_time = datetime.fromtimestamp(float(commit.author.time), tzinfo)
+                for file in commit.tree:
+                    if file.name not in self.__commit_times:
+                        self.__commit_times[file.name] = commit_time
+                    elif not ignore_git:# check ignore_git
+                        self.close()
+                        raise Exception(f'{file.name} in {workspace} is not commited') from None
                     
     @property
     def path(self):
@@ -74,6 +94,12 @@ class Workspace:
 
     def last_commit_time(self, file_path):
         return self.__commit_times.get(str(file_path), '')
+
+    def last_commit_times(self, file_paths):
+        # Commit times for every file are gathered in a single repository
+        # walk at construction, so a bulk lookup is just dict access
+        return { str(file_path): self.__commit_times.get(str(file_path), '')
+                    for file_path in file_paths }
     
     def workspace_url(self):
         url = self.repository.remotes["origin"].url